@@ -1,5 +1,7 @@
 from datetime import timedelta
 
+from sqlalchemy import select
+
 from ichnaea.cache import redis_pipeline
 from ichnaea.data.tasks import cleanup_stat, update_statcounter, update_statregion
 from ichnaea.models import Radio, RegionStat, Stat, StatCounter, StatKey
@@ -8,74 +10,76 @@ from ichnaea import util
 
 
 class TestStatCounter(object):
-    @property
-    def today(self):
-        return util.utcnow().date()
-
-    @property
-    def yesterday(self):
-        return self.today - timedelta(days=1)
-
-    @property
-    def two_days(self):
-        return self.today - timedelta(days=2)
+    def setup_method(self):
+        # Read the clock once, so all dates in a test agree with each other
+        self.today = util.utcnow().date()
+        self.yesterday = self.today - timedelta(days=1)
+        self.two_days = self.today - timedelta(days=2)
 
     def add_counter(self, redis, stat_key, time, value):
         stat_counter = StatCounter(stat_key, time)
         with redis_pipeline(redis) as pipe:
             stat_counter.incr(pipe, value)
 
-    def check_stat(self, session, stat_key, time, value):
-        stat = (
-            session.query(Stat).filter(Stat.key == stat_key).filter(Stat.time == time)
-        ).first()
-        assert stat.value == value
+    def add_stat(self, session, stat_key, time, value):
+        session.execute(
+            Stat.__table__.insert().values(key=stat_key, time=time, value=value)
+        )
+
+    def check_stats(self, session, *expected):
+        """Fetch all stats at once and compare (key, time, value) tuples."""
+        columns = Stat.__table__.c
+        rows = session.execute(
+            select([columns.key, columns.time, columns.value])
+        ).fetchall()
+        stats = dict(((row.key, row.time), row.value) for row in rows)
+        for stat_key, time, value in expected:
+            assert stats[(stat_key, time)] == value
 
     def test_first_run(self, celery, redis, session):
         self.add_counter(redis, StatKey.cell, self.today, 3)
 
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.cell, self.today, 3)
+        self.check_stats(session, (StatKey.cell, self.today, 3))
 
     def test_update_from_yesterday(self, celery, redis, session):
         self.add_counter(redis, StatKey.cell, self.today, 4)
-        session.add(Stat(key=StatKey.cell, time=self.yesterday, value=2))
-        session.flush()
+        self.add_stat(session, StatKey.cell, self.yesterday, 2)
 
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.cell, self.today, 6)
+        self.check_stats(session, (StatKey.cell, self.today, 6))
 
     def test_multiple_updates_for_today(self, celery, redis, session):
         self.add_counter(redis, StatKey.cell, self.today, 4)
-        session.add(Stat(key=StatKey.cell, time=self.yesterday, value=5))
-        session.flush()
+        self.add_stat(session, StatKey.cell, self.yesterday, 5)
 
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.cell, self.today, 9)
+        self.check_stats(session, (StatKey.cell, self.today, 9))
 
         self.add_counter(redis, StatKey.cell, self.today, 3)
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.cell, self.today, 12)
+        self.check_stats(session, (StatKey.cell, self.today, 12))
 
     def test_update_with_gap(self, celery, redis, session):
         a_week_ago = self.today - timedelta(days=7)
         self.add_counter(redis, StatKey.cell, self.today, 3)
-        session.add(Stat(key=StatKey.cell, time=a_week_ago, value=7))
-        session.flush()
+        self.add_stat(session, StatKey.cell, a_week_ago, 7)
 
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.cell, self.today, 10)
+        self.check_stats(session, (StatKey.cell, self.today, 10))
 
     def test_update_two_days(self, celery, redis, session):
         self.add_counter(redis, StatKey.cell, self.yesterday, 5)
         self.add_counter(redis, StatKey.cell, self.today, 7)
-        session.add(Stat(key=StatKey.cell, time=self.two_days, value=1))
-        session.add(Stat(key=StatKey.cell, time=self.yesterday, value=3))
-        session.flush()
+        self.add_stat(session, StatKey.cell, self.two_days, 1)
+        self.add_stat(session, StatKey.cell, self.yesterday, 3)
 
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.cell, self.yesterday, 8)
-        self.check_stat(session, StatKey.cell, self.today, 15)
+        self.check_stats(
+            session,
+            (StatKey.cell, self.yesterday, 8),
+            (StatKey.cell, self.today, 15),
+        )
 
     def test_update_all_keys(self, celery, redis, session):
         self.add_counter(redis, StatKey.blue, self.today, 1)
@@ -84,34 +88,36 @@ class TestStatCounter(object):
         self.add_counter(redis, StatKey.unique_blue, self.today, 4)
         self.add_counter(redis, StatKey.unique_cell, self.today, 5)
         self.add_counter(redis, StatKey.unique_wifi, self.today, 6)
-        session.add(Stat(key=StatKey.blue, time=self.yesterday, value=8))
-        session.add(Stat(key=StatKey.cell, time=self.yesterday, value=9))
-        session.add(Stat(key=StatKey.wifi, time=self.yesterday, value=10))
-        session.flush()
+        self.add_stat(session, StatKey.blue, self.yesterday, 8)
+        self.add_stat(session, StatKey.cell, self.yesterday, 9)
+        self.add_stat(session, StatKey.wifi, self.yesterday, 10)
 
         update_statcounter.delay().get()
-        self.check_stat(session, StatKey.blue, self.today, 9)
-        self.check_stat(session, StatKey.cell, self.today, 11)
-        self.check_stat(session, StatKey.wifi, self.today, 13)
-        self.check_stat(session, StatKey.unique_blue, self.today, 4)
-        self.check_stat(session, StatKey.unique_cell, self.today, 5)
-        self.check_stat(session, StatKey.unique_wifi, self.today, 6)
+        self.check_stats(
+            session,
+            (StatKey.blue, self.today, 9),
+            (StatKey.cell, self.today, 11),
+            (StatKey.wifi, self.today, 13),
+            (StatKey.unique_blue, self.today, 4),
+            (StatKey.unique_cell, self.today, 5),
+            (StatKey.unique_wifi, self.today, 6),
+        )
 
 
 class TestStatCleaner(object):
-    @property
-    def today(self):
-        return util.utcnow().date()
+    def setup_method(self):
+        self.today = util.utcnow().date()
 
     def _one(self, key, time):
-        return Stat(key=key, time=time, value=1)
+        return dict(key=key, time=time, value=1)
 
     def test_empty(self, celery, session):
         cleanup_stat.delay().get()
         assert session.query(Stat).count() == 0
 
     def test_cleanup(self, celery, session):
-        session.add_all(
+        session.execute(
+            Stat.__table__.insert(),
             [
                 self._one(StatKey.cell, self.today),
                 self._one(StatKey.cell, self.today - timedelta(days=366 * 2)),
@@ -121,20 +127,35 @@ class TestStatCleaner(object):
                 self._one(StatKey.blue, self.today - timedelta(days=366 * 2)),
                 self._one(StatKey.unique_blue, self.today),
                 self._one(StatKey.unique_blue, self.today - timedelta(days=366)),
-            ]
+            ],
         )
-        session.flush()
 
         cleanup_stat.delay().get()
         assert session.query(Stat).count() == 5
 
 
 class TestStatRegion(object):
+    def get_stats(self, session):
+        """Return (region, gsm, wcdma, lte, blue, wifi) tuples, sorted by region."""
+        columns = RegionStat.__table__.c
+        rows = session.execute(
+            select(
+                [
+                    columns.region,
+                    columns.gsm,
+                    columns.wcdma,
+                    columns.lte,
+                    columns.blue,
+                    columns.wifi,
+                ]
+            ).order_by(columns.region)
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
     def test_empty(self, celery, session):
         """update_statregion exits early with no data."""
         update_statregion.delay().get()
-        stats = session.query(RegionStat).all()
-        assert stats == []
+        assert self.get_stats(session) == []
 
     def test_null_region_no_stat(self, celery, session):
         """update_statregion ignores stations with no region."""
@@ -145,8 +166,7 @@ class TestStatRegion(object):
         session.flush()
 
         update_statregion.delay().get()
-        stats = session.query(RegionStat).all()
-        assert stats == []
+        assert self.get_stats(session) == []
 
     def test_insert(self, celery, session):
         """update_statregion creates RegionStats for new regions."""
@@ -162,12 +182,8 @@ class TestStatRegion(object):
         session.flush()
 
         update_statregion.delay().get()
-        stats = session.query(RegionStat).order_by("region").all()
-        assert len(stats) == 4
-        actual = [
-            (stat.region, stat.gsm, stat.wcdma, stat.lte, stat.blue, stat.wifi)
-            for stat in stats
-        ]
+        actual = self.get_stats(session)
+        assert len(actual) == 4
         expected = [
             ("CA", 2, 0, 4, 2, 0),
             ("DE", 3, 3, 0, 0, 5),
@@ -186,13 +202,7 @@ class TestStatRegion(object):
         session.flush()
 
         update_statregion.delay().get()
-        stat = session.query(RegionStat).order_by("region").one()
-        assert stat.region == "DE"
-        assert stat.gsm == 3
-        assert stat.wcdma == 3
-        assert stat.lte == 0
-        assert stat.blue == 0
-        assert stat.wifi == 5
+        assert self.get_stats(session) == [("DE", 3, 3, 0, 0, 5)]
 
     def test_update_no_changes(self, celery, session):
         """update_statregion does nothing if counts are accurate."""
@@ -204,13 +214,7 @@ class TestStatRegion(object):
         session.flush()
 
         update_statregion.delay().get()
-        stat = session.query(RegionStat).order_by("region").one()
-        assert stat.region == "CA"
-        assert stat.gsm == 2
-        assert stat.wcdma == 0
-        assert stat.lte == 4
-        assert stat.blue == 2
-        assert stat.wifi == 0
+        assert self.get_stats(session) == [("CA", 2, 0, 4, 2, 0)]
 
     def test_delete(self, celery, session):
         """update_statregion deletes RegionStats when no radios remain."""
@@ -222,6 +226,6 @@ class TestStatRegion(object):
         session.flush()
 
         update_statregion.delay().get()
-        stats = session.query(RegionStat).all()
+        stats = self.get_stats(session)
         assert len(stats) == 1
-        assert stats[0].region == "GB"
+        assert stats[0][0] == "GB"
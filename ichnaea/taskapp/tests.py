@@ -97,4 +97,5 @@ class TestBeat(object):
 class TestWorkerConfig(object):
     def test_config(self, celery):
         assert celery.conf["task_always_eager"]
+        assert celery.conf["task_eager_propagates"]
         assert "redis" in celery.conf["result_backend"]